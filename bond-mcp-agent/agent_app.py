@@ -1,24 +1,50 @@
 import os
+import re
+import copy
+import json
 import asyncio
+import hashlib
+import logging
+import functools
+import threading
+import pathlib
+import anyio
+import numpy as np
+import tiktoken
 import gradio as gr
-from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from dotenv import load_dotenv
 from pydantic import create_model, Field
 
 # Load environment variables
 load_dotenv()
 
+# Logging is configured when the app is launched (see the bottom of this file)
+logger = logging.getLogger(__name__)
+tool_logger = logging.getLogger("mcp.tools")
+
+from sentence_transformers import SentenceTransformer
 from langchain_openai import ChatOpenAI
+from langchain_core.messages import AIMessageChunk
 from langchain_core.tools import StructuredTool
 from langgraph.prebuilt import create_react_agent
 from langgraph.graph import MessagesState
 
 # MCP Imports
-from mcp import ClientSession, StdioServerParameters
+from mcp import ClientSession, McpError, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
 # Constants
 SERVER_SCRIPT = "server.py"
+AGENT_MODEL = os.getenv("AGENT_MODEL", "gpt-4o-mini")
+STREAM_COMPACT_EVERY = 256  # Collapse buffered stream chunks after this many pieces
+TOOL_CALL_TIMEOUT = timedelta(seconds=30)  # A hung server is treated like a lost connection
+
+# Local cache of the MCP tool catalog, so discovery doesn't hit the server on every query
+_TOOL_CACHE_PATH = pathlib.Path(__file__).parent / ".mcp_tool_cache.json"
 
 def get_mcp_server_params() -> StdioServerParameters:
     """Returns the parameters to start the MCP server."""
@@ -28,70 +54,188 @@ def get_mcp_server_params() -> StdioServerParameters:
         env=os.environ.copy() # Inherit environment variables
     )
 
-async def convert_mcp_tools(session: ClientSession) -> List[StructuredTool]:
+def _tool_cache_key() -> str:
+    """Hash of the server source and launch script, used to invalidate the tool cache."""
+    server_source = (pathlib.Path(__file__).parent / SERVER_SCRIPT).read_bytes()
+    return hashlib.sha256(server_source + SERVER_SCRIPT.encode()).hexdigest()
+
+async def load_or_discover_tools(session: ClientSession) -> List[Dict[str, Any]]:
     """
-    Query the MCP server for tools and convert them to LangChain StructuredTools.
+    Return the MCP tool catalog as a list of {name, description, inputSchema} dicts.
+    Served from the local cache when server.py is unchanged, otherwise discovered
+    via list_tools() and written back to the cache.
     """
+    cache_key = _tool_cache_key()
+
+    try:
+        cached = json.loads(_TOOL_CACHE_PATH.read_text())
+        if isinstance(cached, dict) and cached.get("key") == cache_key:
+            return cached["tools"]
+    except (OSError, ValueError, KeyError):
+        pass  # Missing or corrupt cache, fall through to discovery
+
     mcp_tools_list = await session.list_tools()
-    langchain_tools = []
+    tool_specs = [
+        {
+            "name": tool.name,
+            "description": tool.description,
+            "inputSchema": tool.inputSchema,
+        }
+        for tool in mcp_tools_list.tools
+    ]
 
-    for tool in mcp_tools_list.tools:
-        # We need to capture the specific tool name in the closure
-        tool_name = tool.name
-        
-        # Capture tool_name by value using a default argument or a factory
-        # Using a factory method to be cleaner and safer
-        def create_wrapper(t_name: str):
-            async def _wrapper(**kwargs) -> str:
-                print(f"[DEBUG] Calling tool: {t_name} with args: {kwargs}")
-                try:
-                    result = await session.call_tool(t_name, arguments=kwargs)
-                    text_output = []
-                    if hasattr(result, 'content'):
-                        for item in result.content:
-                            if hasattr(item, 'text'):
-                                text_output.append(item.text)
-                            else:
-                                print(f"[DEBUG] Unknown content item: {item}")
-                    output = "\n".join(text_output)
-                    print(f"[DEBUG] Tool {t_name} output: {output[:200]}...") 
-                    return output
-                except Exception as e:
-                    print(f"[ERROR] Tool {t_name} failed: {e}")
-                    raise e
-            return _wrapper
+    try:
+        _TOOL_CACHE_PATH.write_text(json.dumps({"key": cache_key, "tools": tool_specs}))
+    except OSError as e:
+        logger.warning("Could not write tool cache: %s", e)
+
+    return tool_specs
+
+# JSON-schema type -> Python type for the generated args models
+_JSON_TO_PY = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "array": List[str],
+    "object": Dict[str, Any],
+}
+
+def _json_schema_type(prop_def: Dict[str, Any]) -> Any:
+    """Map a JSON-schema property definition to a Python type, defaulting to str."""
+    json_type = prop_def.get('type')
+    if isinstance(json_type, list):
+        # A nullable type can also be written as a list, e.g. ["integer", "null"]
+        json_type = next((option for option in json_type if option != 'null'), None)
+    if json_type is None and 'anyOf' in prop_def:
+        # Optional params come through as anyOf [{type: X}, {type: null}]
+        for option in prop_def['anyOf']:
+            if option.get('type') not in (None, 'null'):
+                return _json_schema_type(option)
+
+    if json_type == 'array':
+        item_type = prop_def.get('items', {}).get('type')
+        return List[_JSON_TO_PY.get(item_type, str)]
+    return _JSON_TO_PY.get(json_type, str)
+
+# Tool descriptions and schemas are sent to the LLM on every agent turn, so keep them short
+TOOL_DESCRIPTION_MAX_CHARS = 140
+ARG_DESCRIPTION_MAX_WORDS = 15
+
+def _compact_tool_description(description: str) -> tuple[str, Dict[str, str]]:
+    """
+    Split a FastMCP docstring-style description into a one-line summary
+    (capped at TOOL_DESCRIPTION_MAX_CHARS) and a {arg: description} map from its Args: section.
+    """
+    parts = re.split(r"^\s*Args:\s*$", description, maxsplit=1, flags=re.M)
+    summary = re.sub(r"\s+", " ", parts[0]).strip()[:TOOL_DESCRIPTION_MAX_CHARS]
+    args_section = parts[1] if len(parts) > 1 else ""
+
+    arg_docs: Dict[str, str] = {}
+    current = None
+    for line in args_section.splitlines():
+        match = re.match(r"\s*(\w+):\s*(.*)", line)
+        if match:
+            current = match.group(1)
+            arg_docs[current] = match.group(2)
+        elif current and line.strip():
+            arg_docs[current] += " " + line.strip()
+    return summary, arg_docs
+
+@functools.lru_cache(maxsize=256)
+def _build_args_model(name: str, schema_json: str) -> type:
+    """
+    Build the Pydantic args model for a tool from its JSON input schema.
+    Memoized by (name, schema JSON), since create_model is comparatively expensive.
+    """
+    input_schema = json.loads(schema_json)
+    fields = {}
+    
+    if 'properties' in input_schema:
+        for prop_name, prop_def in input_schema['properties'].items():
+            prop_type = _json_schema_type(prop_def)
             
-        tool_wrapper = create_wrapper(tool_name)
+            # None rather than "" for undocumented args, so no empty description key is sent
+            description = " ".join(prop_def.get('description', '').split()[:ARG_DESCRIPTION_MAX_WORDS]) or None
+            
+            # Check if required
+            if 'required' in input_schema and prop_name in input_schema['required']:
+                fields[prop_name] = (prop_type, Field(description=description))
+            else:
+                # Use the server's own default, so a filled-in default is a value the server accepts
+                fields[prop_name] = (Optional[prop_type], Field(default=prop_def.get('default'), description=description))
+    
+    # Create the Pydantic model
+    return create_model(f"{name}Args", **fields)
+
+class _ToolDispatcher:
+    """
+    Single entry point for every MCP tool call; each StructuredTool gets a thin
+    coroutine from bind() that forwards its tool name to call().
+    """
+
+    def __init__(self, pool: "MCPServerPool"):
+        self.pool = pool
 
+    def bind(self, tool_name: str) -> Callable[..., Awaitable[str]]:
+        # A real annotated function rather than functools.partial: LangGraph's ToolNode
+        # runs get_type_hints() over the tool coroutine, which rejects partial objects
+        async def call_tool(**kwargs: Any) -> str:
+            return await self.call(tool_name, **kwargs)
 
+        call_tool.__name__ = tool_name
+        return call_tool
+
+    async def call(self, tool_name: str, /, **kwargs) -> str:
+        # tool_name is positional-only so a tool argument called "name" etc. can't clash with it
+        # An omitted optional argument can still arrive as None (from the model or a filled-in
+        # default); leave it out so the server applies its own default instead of rejecting null
+        kwargs = {key: value for key, value in kwargs.items() if value is not None}
+        tool_logger.debug("Calling tool: %s with args: %s", tool_name, kwargs)
+        try:
+            result = await self.pool.call_tool(tool_name, kwargs)
+            output = "\n".join(item.text for item in getattr(result, 'content', ()) if hasattr(item, 'text'))
+            # Guard so the preview slice is only built when debug logging is on
+            if tool_logger.isEnabledFor(logging.DEBUG):
+                tool_logger.debug("Tool %s output: %s...", tool_name, output[:200])
+            return output
+        except Exception as e:
+            tool_logger.error("Tool %s failed: %s", tool_name, e)
+            raise e
+
+async def convert_mcp_tools(pool: "MCPServerPool") -> List[StructuredTool]:
+    """
+    Load the MCP tool catalog (cached or discovered) and convert it to LangChain StructuredTools.
+    Tool calls are routed through the pool so they survive a reconnect.
+    """
+    tool_specs = await load_or_discover_tools(pool.session)
+    dispatcher = _ToolDispatcher(pool)
+    langchain_tools = []
+
+    for tool in tool_specs:
+        tool_name = tool["name"]
+        description, arg_docs = _compact_tool_description(tool["description"] or f"Tool named {tool_name}")
+        
+        # Bind the tool name onto the shared dispatcher
+        tool_coroutine = dispatcher.bind(tool_name)
 
         # Dynamic Schema Generation for Pydantic
         # This bridges the gap so the LLM knows what arguments to expect.
-        input_schema = tool.inputSchema
-        fields = {}
-        
-        if 'properties' in input_schema:
-            for prop_name, prop_def in input_schema['properties'].items():
-                prop_type = str  # Default to string for simplicity as most args are strings here
-                # We could map 'integer' -> int, 'number' -> float, 'boolean' -> bool etc if needed
-                
-                description = prop_def.get('description', '')
-                
-                # Check if required
-                if 'required' in input_schema and prop_name in input_schema['required']:
-                    fields[prop_name] = (prop_type, Field(description=description))
-                else:
-                    fields[prop_name] = (Optional[prop_type], Field(default=None, description=description))
-        
-        # Create the Pydantic model
-        ArgsModel = create_model(f"{tool.name}Args", **fields)
+        # Keyed on the canonical schema JSON so an unchanged schema reuses the same model class.
+        # Argument docs from the docstring fill in any property descriptions the schema lacks.
+        input_schema = copy.deepcopy(tool["inputSchema"])
+        for prop_name, prop_def in input_schema.get('properties', {}).items():
+            if not prop_def.get('description') and prop_name in arg_docs:
+                prop_def['description'] = arg_docs[prop_name]
+        schema_json = json.dumps(input_schema, sort_keys=True)
+        ArgsModel = _build_args_model(tool_name, schema_json)
 
         # Create the StructuredTool with the explicit args_schema
         lc_tool = StructuredTool.from_function(
             func=None,
-            coroutine=tool_wrapper,
-            name=tool.name,
-            description=tool.description or f"Tool named {tool.name}",
+            coroutine=tool_coroutine,
+            name=tool_name,
+            description=description,
             args_schema=ArgsModel
         )
         
@@ -99,19 +243,229 @@ async def convert_mcp_tools(session: ClientSession) -> List[StructuredTool]:
 
     return langchain_tools
 
-from prompts import INTENT_VALIDATION_PROMPT
+# Errors that indicate the stdio pipe to the MCP server is gone (or the server has hung)
+_CONNECTION_ERRORS = (
+    TimeoutError,
+    BrokenPipeError,
+    ConnectionError,
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+)
+
+class MCPServerPool:
+    """
+    Keeps a single MCP stdio session alive for the lifetime of the app,
+    instead of spawning the server subprocess on every chat message.
+
+    The stdio_client / ClientSession contexts are entered and exited by one
+    long-lived background task, since anyio requires a cancel scope to be
+    exited from the task that entered it.
+    """
+
+    def __init__(self):
+        self.session: Optional[ClientSession] = None
+        self.tools: Optional[List[StructuredTool]] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Future] = None
+        self._shutdown: Optional[asyncio.Event] = None
+        self._warm_task: Optional[asyncio.Task] = None
+        self._connect_lock = asyncio.Lock()
+        self._tools_lock = asyncio.Lock()
+        self._call_lock = asyncio.Lock()
+
+    async def _run(self, ready: asyncio.Future, shutdown: asyncio.Event):
+        """Own the server connection until shutdown is set."""
+        try:
+            async with stdio_client(get_mcp_server_params()) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    ready.set_result(session)
+                    await shutdown.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning("MCP session ended with an error: %s", e)
+        finally:
+            self.session = None
+            if not ready.done():
+                ready.cancel()
+
+    async def ensure_ready(self) -> ClientSession:
+        """Start the server and initialize the session on first use."""
+        async with self._connect_lock:
+            if self._runner is None or self._runner.done():
+                self._ready = asyncio.get_running_loop().create_future()
+                self._shutdown = asyncio.Event()
+                self._runner = asyncio.create_task(self._run(self._ready, self._shutdown), name="mcp-server-pool")
+            ready = self._ready
+        # Shielded so a cancelled caller doesn't cancel the shared startup
+        return await asyncio.shield(ready)
+
+    async def get_tools(self) -> List[StructuredTool]:
+        """
+        Return the LangChain tools, converting them only once per pool.
+        Tools are sorted by name so the prompt prefix is identical on every call,
+        which lets OpenAI's automatic prompt caching kick in.
+        """
+        await self.ensure_ready()
+        async with self._tools_lock:
+            if self.tools is None:
+                tools = await convert_mcp_tools(self)
+                self.tools = sorted(tools, key=lambda t: t.name)
+        return self.tools
+
+    async def warm_up(self):
+        """
+        Start the server and load tools ahead of need. Errors are only logged;
+        they resurface from get_tools() when the tools are actually requested.
+        """
+        try:
+            await self.get_tools()
+        except Exception as e:
+            logger.warning("MCP warm-up failed: %s", e)
+
+    def start_warm_up(self) -> asyncio.Task:
+        """Run warm_up() in the background, keeping a reference so the task isn't garbage collected."""
+        if self._warm_task is None or self._warm_task.done():
+            self._warm_task = asyncio.create_task(self.warm_up(), name="mcp-server-warm-up")
+        return self._warm_task
+
+    @staticmethod
+    async def _call_with_timeout(session: ClientSession, name: str, arguments: Dict[str, Any]):
+        try:
+            return await session.call_tool(name, arguments=arguments, read_timeout_seconds=TOOL_CALL_TIMEOUT)
+        except McpError as e:
+            # The session reports a read timeout as an McpError with an HTTP 408 code
+            if e.error.code == HTTPStatus.REQUEST_TIMEOUT:
+                raise TimeoutError(e.error.message) from e
+            raise
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]):
+        """
+        Call a tool on the shared session, reconnecting once if the pipe has broken
+        or the server doesn't answer within TOOL_CALL_TIMEOUT.
+        """
+        async with self._call_lock:
+            session = await self.ensure_ready()
+            try:
+                return await self._call_with_timeout(session, name, arguments)
+            except _CONNECTION_ERRORS as e:
+                logger.warning("MCP connection lost (%r), reconnecting...", e)
+                await self.close()
+                session = await self.ensure_ready()
+                return await self._call_with_timeout(session, name, arguments)
+
+    async def close(self):
+        """Tear down the session and the server subprocess."""
+        if self._warm_task is not None and not self._warm_task.done():
+            self._warm_task.cancel()
+        async with self._connect_lock:
+            runner = self._runner
+            self._runner = None
+            if runner is None:
+                return
+            self._shutdown.set()
+            try:
+                await runner
+            except BaseException as e:
+                logger.warning("Error while closing MCP session: %r", e)
+
+# Shared MCP connection, started by the app's lifespan hook (or lazily on first use)
+mcp_pool = MCPServerPool()
+
+from prompts import INTENT_VALIDATION_PROMPT, FINANCE_INTENT_EXEMPLARS
+
+# Local intent classifier: cosine similarity against finance exemplars
+INTENT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+INTENT_ACCEPT_THRESHOLD = 0.35  # At or above: accept without an LLM call
+INTENT_REJECT_THRESHOLD = 0.25  # Below: reject without an LLM call
+
+_intent_index: Optional[tuple[SentenceTransformer, np.ndarray]] = None
+_intent_index_lock = threading.Lock()
+
+def _get_intent_index() -> tuple[SentenceTransformer, np.ndarray]:
+    """
+    Load the embedding model and encode the exemplars, once.
+    Deferred from import so the module loads without fetching the model.
+    """
+    global _intent_index
+    with _intent_index_lock:
+        if _intent_index is None:
+            encoder = SentenceTransformer(INTENT_EMBEDDING_MODEL)
+            _intent_index = (encoder, encoder.encode(FINANCE_INTENT_EXEMPLARS, normalize_embeddings=True))
+        return _intent_index
+
+def _intent_score(message: str) -> float:
+    """Highest cosine similarity between the message and any finance exemplar."""
+    encoder, exemplars = _get_intent_index()
+    query = encoder.encode(message, normalize_embeddings=True)
+    return float(np.max(exemplars @ query))
+
+async def _warm_up_intent_model():
+    """Load the embedding model ahead of the first message; errors resurface on first use."""
+    try:
+        await asyncio.to_thread(_get_intent_index)
+    except Exception as e:
+        logger.warning("Intent model warm-up failed: %s", e)
+
+# LLM fallback: a single output token restricted to YES / NO
+INTENT_FALLBACK_MODEL = "gpt-4o-mini"
+
+def _single_token_id(encoding: tiktoken.Encoding, text: str) -> int:
+    """Return the token id for text, which must encode to exactly one token."""
+    token_ids = encoding.encode(text)
+    if len(token_ids) != 1:
+        raise ValueError(f"{text!r} does not encode to a single token: {token_ids}")
+    return token_ids[0]
+
+def _intent_logit_bias() -> Dict[int, int]:
+    """
+    Bias the YES and NO tokens so they are the only plausible output.
+    Looking up the encoding may download its vocabulary, so this runs on first use, not at import.
+    """
+    encoding = tiktoken.encoding_for_model(INTENT_FALLBACK_MODEL)
+    return {
+        _single_token_id(encoding, "YES"): 100,
+        _single_token_id(encoding, "NO"): 100,
+    }
+
+# Shared LLM clients. Built on first use rather than at import, since ChatOpenAI
+# needs OPENAI_API_KEY and run_agent_interaction reports a missing key itself.
+# Reusing one client keeps its HTTP connection pool alive across turns.
+@functools.cache
+def get_intent_llm() -> ChatOpenAI:
+    return ChatOpenAI(
+        model=INTENT_FALLBACK_MODEL,
+        temperature=0,
+        max_tokens=1,
+        logit_bias=_intent_logit_bias(),
+    )
+
+@functools.cache
+def get_agent_llm() -> ChatOpenAI:
+    return ChatOpenAI(model=AGENT_MODEL, temperature=0)
 
 async def validate_intent(message: str) -> bool:
     """
     Validates if the user query is related to finance or reference data.
     Returns True if valid, False otherwise.
+    Only queries in the uncertain similarity band fall back to an LLM call.
     """
+    # The forward pass is CPU-bound, so keep it off the event loop shared by all users
+    score = await asyncio.to_thread(_intent_score, message)
+
+    if score >= INTENT_ACCEPT_THRESHOLD:
+        return True
+    if score < INTENT_REJECT_THRESHOLD:
+        return False
+
     prompt = INTENT_VALIDATION_PROMPT.format(message=message)
     
-    llm = ChatOpenAI(model="gpt-4o", temperature=0)
-    response = await llm.ainvoke(prompt)
-    content = response.content.strip().upper()
-    return "YES" in content
+    response = await get_intent_llm().ainvoke(prompt)
+    return response.content[:1] == "Y"
 
 async def run_agent_interaction(message: str, history: List[Any]):
     """
@@ -123,61 +477,80 @@ async def run_agent_interaction(message: str, history: List[Any]):
         yield "⚠️ OPENAI_API_KEY is missing from environment variables! Please set it."
         return
 
-    # 2. Intent Check
-    yield "🔍 Analyzing intent..."
-    is_valid = await validate_intent(message)
-    
-    if not is_valid:
-        yield "❌ **Request Rejected**: Your query does not appear to be related to financial reference data. Please ask about bonds, issuers, or credit ratings."
-        return
+    try:
+        # 2. Intent Check
+        # The MCP server warms up in a pool-owned background task while the intent check runs,
+        # so a rejection returns straight away and the server is still warm for the next message.
+        # Inside the try, since the first check may still have to load the intent model.
+        yield "🔍 Analyzing intent..."
+        mcp_pool.start_warm_up()
+        is_valid = await validate_intent(message)
+        
+        if not is_valid:
+            yield "❌ **Request Rejected**: Your query does not appear to be related to financial reference data. Please ask about bonds, issuers, or credit ratings."
+            return
 
-    yield "✅ Intent verified. Processing..."
+        yield "✅ Intent verified. Processing..."
 
-    # 3. Connect to MCP Server 
-    server_params = get_mcp_server_params()
-    
-    try:
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                
-                # 4. Get and bind Tools
-                tools = await convert_mcp_tools(session)
-                
-                # 5. Initialize LLM & Agent
-                llm = ChatOpenAI(model="gpt-4o", temperature=0)
-                agent_executor = create_react_agent(llm, tools)
-                
-                # 6. Run Agent with Streaming
-                # We retain the accumulated response to append to it
-                accumulated_response = ""
-                
-                async for event in agent_executor.astream_events(
-                    {"messages": [("user", message)]},
-                    version="v1"
-                ):
-                    kind = event["event"]
+        # 3. Connect to MCP Server (get_tools() joins the warm-up if it is still running)
+        # 4. Get and bind Tools
+        tools = await mcp_pool.get_tools()
+        
+        # 5. Initialize LLM & Agent
+        agent_executor = create_react_agent(get_agent_llm(), tools)
+        
+        # 6. Run Agent with Streaming
+        # We retain the response pieces and join them on each yield, rather than
+        # re-concatenating one growing string per token
+        chunks: List[str] = []
+
+        def render() -> str:
+            full = "".join(chunks)
+            # Compact the list so the join stays cheap on long answers
+            if len(chunks) > STREAM_COMPACT_EVERY:
+                chunks[:] = [full]
+            return full
+        
+        # "messages" streams LLM tokens; "updates" gives each node's completed output,
+        # which carries the full tool calls and tool results
+        async for mode, payload in agent_executor.astream(
+            {"messages": [("user", message)]},
+            stream_mode=["messages", "updates"]
+        ):
+            if mode == "messages":
+                msg_chunk, metadata = payload
+                if metadata.get("langgraph_node") == "agent" and isinstance(msg_chunk, AIMessageChunk):
+                    content = msg_chunk.content
+                    if content:
+                        chunks.append(content)
+                        yield render()
+                continue
+
+            for node, update in payload.items():
+                for msg in (update or {}).get("messages", []):
+                    if node == "agent":
+                        for tool_call in getattr(msg, "tool_calls", None) or []:
+                            chunks.append(f"\n\n🛠️ **Calling Tool**: `{tool_call['name']}`\nArgs: `{tool_call['args']}`\n")
+                            yield render()
+
+                    elif node == "tools":
+                        chunks.append(f"✅ **Tool `{msg.name}` Finished**\n")
+                        yield render()
                     
-                    if kind == "on_tool_start":
-                        tool_name = event['name']
-                        tool_input = event['data'].get('input')
-                        accumulated_response += f"\n\n🛠️ **Calling Tool**: `{tool_name}`\nArgs: `{tool_input}`\n"
-                        yield accumulated_response
-                        
-                    elif kind == "on_tool_end":
-                        tool_name = event['name']
-                        accumulated_response += f"✅ **Tool `{tool_name}` Finished**\n"
-                        yield accumulated_response
-
-                    elif kind == "on_chat_model_stream":
-                        content = event['data']['chunk'].content
-                        if content:
-                            accumulated_response += content
-                            yield accumulated_response
-                            
     except Exception as e:
         yield f"Error: {str(e)}"
 
+@asynccontextmanager
+async def app_lifespan(app):
+    """Warm up the MCP server and intent model with the web app, and shut the server down when it stops."""
+    mcp_pool.start_warm_up()
+    intent_warm_up = asyncio.create_task(_warm_up_intent_model())
+    try:
+        yield
+    finally:
+        intent_warm_up.cancel()
+        await mcp_pool.close()
+
 # UI Layout
 with gr.Blocks(theme=gr.themes.Soft()) as demo:
     gr.Markdown("## 🏦 Agentic Financial RAG")
@@ -202,4 +575,12 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
     gr.Markdown("### Powered by LangGraph & MCP")
 
 if __name__ == "__main__":
-    demo.launch()
+    # Logging (set LOG_LEVEL=DEBUG to trace individual tool calls); unknown levels fall back to INFO
+    log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+    logging.basicConfig(
+        level=logging.getLevelNamesMapping().get(log_level, logging.INFO),
+        format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+    )
+    if log_level not in logging.getLevelNamesMapping():
+        logger.warning("Unknown LOG_LEVEL %r, using INFO", log_level)
+    demo.launch(app_kwargs={"lifespan": app_lifespan})
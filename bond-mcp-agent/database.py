@@ -5,6 +5,9 @@ from datetime import date
 # Define the database file path relative to this script
 DB_FILE = pathlib.Path(__file__).parent / "finance.db"
 
+# Tokenizer for the issuers full-text index
+ISSUERS_FTS_TOKENIZER = "unicode61"
+
 def init_db():
     """Initialize the database with the required schema."""
     conn = sqlite3.connect(DB_FILE)
@@ -13,6 +16,12 @@ def init_db():
     # Enable foreign key constraint enforcement
     cursor.execute("PRAGMA foreign_keys = ON;")
 
+    # Page size only takes effect on a new database, and must be set before switching to WAL
+    cursor.execute("PRAGMA page_size = 4096;")
+
+    # WAL is persisted in the file, so read-only readers (server.py) never block on writers
+    cursor.execute("PRAGMA journal_mode = WAL;")
+
     # Create issuers table
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS issuers (
@@ -49,6 +58,52 @@ def init_db():
     );
     """)
 
+    # Indexes for the MCP server's lookups
+    # Latest rating per ISIN becomes an index seek instead of a scan + sort
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ratings_isin_date ON bond_ratings(isin, rating_date DESC);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_instruments_issuer ON instruments(issuer_id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_issuers_name ON issuers(legal_name COLLATE NOCASE);")
+
+    # Full-text index over issuers for search_issuer, backed by the issuers table itself.
+    # No porter stemming: search_issuer prefix-matches partial names, and stemming would
+    # index "Government" as "govern" so a prefix like "Governm" would never match.
+    cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'issuers_fts';")
+    existing = cursor.fetchone()
+    if existing and f"tokenize='{ISSUERS_FTS_TOKENIZER}'" not in existing[0]:
+        # Created with a different tokenizer; recreate it (the rebuild below re-indexes it)
+        cursor.execute("DROP TABLE issuers_fts;")
+
+    cursor.execute(f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS issuers_fts USING fts5(
+        legal_name,
+        lei,
+        content='issuers',
+        content_rowid='issuer_id',
+        tokenize='{ISSUERS_FTS_TOKENIZER}'
+    );
+    """)
+
+    # Keep the full-text index in sync with the issuers table
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS issuers_fts_insert AFTER INSERT ON issuers BEGIN
+        INSERT INTO issuers_fts (rowid, legal_name, lei) VALUES (new.issuer_id, new.legal_name, new.lei);
+    END;
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS issuers_fts_delete AFTER DELETE ON issuers BEGIN
+        INSERT INTO issuers_fts (issuers_fts, rowid, legal_name, lei) VALUES ('delete', old.issuer_id, old.legal_name, old.lei);
+    END;
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS issuers_fts_update AFTER UPDATE ON issuers BEGIN
+        INSERT INTO issuers_fts (issuers_fts, rowid, legal_name, lei) VALUES ('delete', old.issuer_id, old.legal_name, old.lei);
+        INSERT INTO issuers_fts (rowid, legal_name, lei) VALUES (new.issuer_id, new.legal_name, new.lei);
+    END;
+    """)
+
+    # Index any issuers that existed before the full-text table was (re)created
+    cursor.execute("INSERT INTO issuers_fts (issuers_fts) VALUES ('rebuild');")
+
     conn.commit()
     conn.close()
     print(f"Database initialized at {DB_FILE}")
@@ -65,62 +120,79 @@ def seed_data():
         conn.close()
         return
 
-    # Seed Issuers
-    # US Treasury, Apple, Microsoft, Petrobras (Emerging Market), and a generic bank
-    issuers = [
-        ("5493006MNBPLPEVJEJ08", "US Treasury", "USA", "Government"),
-        ("549300F299002598R715", "Apple Inc.", "USA", "Technology"),
-        ("INR123456789", "Reliance Industries Ltd", "IN", "Energy"),
-        ("5493001R1363646N5762", "European Investment Bank", "LU", "Supranational"),
-        ("JPSK01239102", "Japan Government", "JP", "Government")
-    ]
+    # Bulk-load in one explicit transaction with relaxed durability; the seed can simply be re-run.
+    # Take manual control of transactions, and remember the settings to restore afterwards.
+    conn.isolation_level = None
+    previous_journal_mode = cursor.execute("PRAGMA journal_mode;").fetchone()[0]
+    previous_synchronous = cursor.execute("PRAGMA synchronous;").fetchone()[0]
+    cursor.execute("PRAGMA synchronous = OFF;")
+    cursor.execute("PRAGMA journal_mode = MEMORY;")
+    cursor.execute("BEGIN IMMEDIATE;")
+    try:
+        # Seed Issuers
+        # US Treasury, Apple, Microsoft, Petrobras (Emerging Market), and a generic bank
+        issuers = [
+            ("5493006MNBPLPEVJEJ08", "US Treasury", "USA", "Government"),
+            ("549300F299002598R715", "Apple Inc.", "USA", "Technology"),
+            ("INR123456789", "Reliance Industries Ltd", "IN", "Energy"),
+            ("5493001R1363646N5762", "European Investment Bank", "LU", "Supranational"),
+            ("JPSK01239102", "Japan Government", "JP", "Government")
+        ]
     
-    cursor.executemany("""
-        INSERT INTO issuers (lei, legal_name, country, sector) 
-        VALUES (?, ?, ?, ?)
-    """, issuers)
-
-    # Get generated issuer IDs
-    cursor.execute("SELECT issuer_id, legal_name FROM issuers")
-    issuer_map = {name: iid for iid, name in cursor.fetchall()}
-
-    # Seed Instruments (Bonds)
-    # Mapping to correct issuer_ids
-    instruments = [
-        # US Treasury Bond
-        ("US912810TS08", "BBG000DQQNJ8", issuer_map["US Treasury"], "2030-05-15", 0.625, "USD"),
-        # Apple Corporate Bond
-        ("US037833AS99", "BBG005P7Q8K7", issuer_map["Apple Inc."], "2025-05-06", 3.25, "USD"),
-        # Reliance Bond
-        ("IN0020220011", "BBG003ABC123", issuer_map["Reliance Industries Ltd"], "2028-09-01", 7.50, "INR"),
-        # EIB Green Bond
-        ("XS2345678901", "BBG001XYZ987", issuer_map["European Investment Bank"], "2031-11-15", 0.50, "EUR"),
-        # JGB
-        ("JP1200021F77", "BBG002JGB456", issuer_map["Japan Government"], "2040-03-20", 1.8, "JPY")
-    ]
-
-    cursor.executemany("""
-        INSERT INTO instruments (isin, figi, issuer_id, maturity_date, coupon, currency)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, instruments)
+        cursor.executemany("""
+            INSERT INTO issuers (lei, legal_name, country, sector) 
+            VALUES (?, ?, ?, ?)
+        """, issuers)
+
+        # Get generated issuer IDs
+        cursor.execute("SELECT issuer_id, legal_name FROM issuers")
+        issuer_map = {name: iid for iid, name in cursor.fetchall()}
+
+        # Seed Instruments (Bonds)
+        # Mapping to correct issuer_ids
+        instruments = [
+            # US Treasury Bond
+            ("US912810TS08", "BBG000DQQNJ8", issuer_map["US Treasury"], "2030-05-15", 0.625, "USD"),
+            # Apple Corporate Bond
+            ("US037833AS99", "BBG005P7Q8K7", issuer_map["Apple Inc."], "2025-05-06", 3.25, "USD"),
+            # Reliance Bond
+            ("IN0020220011", "BBG003ABC123", issuer_map["Reliance Industries Ltd"], "2028-09-01", 7.50, "INR"),
+            # EIB Green Bond
+            ("XS2345678901", "BBG001XYZ987", issuer_map["European Investment Bank"], "2031-11-15", 0.50, "EUR"),
+            # JGB
+            ("JP1200021F77", "BBG002JGB456", issuer_map["Japan Government"], "2040-03-20", 1.8, "JPY")
+        ]
+
+        cursor.executemany("""
+            INSERT INTO instruments (isin, figi, issuer_id, maturity_date, coupon, currency)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, instruments)
     
-    # Seed Ratings
-    ratings = [
-        ("US912810TS08", "Moody's", "Aaa", "2023-01-15"),
-        ("US912810TS08", "S&P", "AA+", "2023-01-15"),
-        ("US037833AS99", "Moody's", "Aa1", "2023-02-10"),
-        ("IN0020220011", "S&P", "BBB+", "2023-06-20"),
-        ("XS2345678901", "Fitch", "AAA", "2023-03-05"),
-        ("JP1200021F77", "S&P", "A+", "2023-07-01")
-    ]
-
-    cursor.executemany("""
-        INSERT INTO bond_ratings (isin, agency, rating_value, rating_date)
-        VALUES (?, ?, ?, ?)
-    """, ratings)
+        # Seed Ratings
+        ratings = [
+            ("US912810TS08", "Moody's", "Aaa", "2023-01-15"),
+            ("US912810TS08", "S&P", "AA+", "2023-01-15"),
+            ("US037833AS99", "Moody's", "Aa1", "2023-02-10"),
+            ("IN0020220011", "S&P", "BBB+", "2023-06-20"),
+            ("XS2345678901", "Fitch", "AAA", "2023-03-05"),
+            ("JP1200021F77", "S&P", "A+", "2023-07-01")
+        ]
 
-    conn.commit()
-    conn.close()
+        cursor.executemany("""
+            INSERT INTO bond_ratings (isin, agency, rating_value, rating_date)
+            VALUES (?, ?, ?, ?)
+        """, ratings)
+
+        cursor.execute("COMMIT;")
+    except Exception:
+        # Nothing is committed on failure, so a re-run starts from an empty database again
+        cursor.execute("ROLLBACK;")
+        raise
+    finally:
+        # journal_mode WAL is persisted in the file, so it must be switched back explicitly
+        cursor.execute(f"PRAGMA journal_mode = {previous_journal_mode};")
+        cursor.execute(f"PRAGMA synchronous = {previous_synchronous};")
+        conn.close()
     print("Seed data inserted successfully.")
 
 if __name__ == "__main__":
@@ -6,3 +6,28 @@ Query: "{message}"
 
 Respond with ONLY 'YES' if it is relevant, or 'NO' if it is irrelevant (e.g., about cars, weather, general chat).
 """
+
+# Reference queries for the local embedding-based intent check.
+# A user query is accepted when it is semantically close to any of these.
+FINANCE_INTENT_EXEMPLARS = [
+    "Who is the issuer of this bond?",
+    "What are the details for ISIN US912810TS08?",
+    "Show me the coupon and maturity date of a bond",
+    "What is the credit rating of this bond?",
+    "Latest Moody's rating for an instrument",
+    "What did S&P rate this issuer?",
+    "Fitch rating for a corporate bond",
+    "Search for issuers with Treasury in their name",
+    "Find the LEI of Apple Inc.",
+    "Look up a legal entity identifier",
+    "Which country and sector is this issuer in?",
+    "List government bonds denominated in USD",
+    "What currency is this bond issued in?",
+    "Get the FIGI for an instrument",
+    "Tell me about Japan Government bonds",
+    "Find bonds issued by a supranational like the European Investment Bank",
+    "What is the yield on a treasury note?",
+    "Reference data for a fixed income security",
+    "Is this bond investment grade?",
+    "When does this corporate bond mature?",
+]
@@ -1,6 +1,11 @@
 from fastmcp import FastMCP
+from collections import OrderedDict
+from uuid import uuid4
 import sqlite3
 import pathlib
+import json
+import re
+import threading
 import os
 
 # Initialize MCP Server
@@ -9,17 +14,91 @@ mcp = FastMCP("BondRefDataServer")
 # Define the database file path relative to this script
 DB_FILE = pathlib.Path(__file__).parent / "finance.db"
 
+# One long-lived connection per thread, reused across tool calls
+_tls = threading.local()
+
+# Large search results are kept server-side and handed to the agent as a result_id,
+# so only a preview enters the LLM context. Oldest entries are evicted first.
+SEARCH_PREVIEW_ROWS = 3
+SEARCH_INLINE_MAX_ROWS = 5
+_RESULT_CACHE_MAX_ENTRIES = 128
+_RESULT_CACHE: "OrderedDict[str, dict]" = OrderedDict()
+
+# Hard bounds on how much search data is fetched and how much a single page can carry
+SEARCH_MAX_MATCHES = 500
+SEARCH_MAX_LIMIT = 100
+SEARCH_MAX_PAYLOAD_BYTES = 8000
+
+# SQL is kept as module constants so every call passes the identical string to the
+# long-lived connection, which then reuses the prepared statement from its cache
+_Q_INSTRUMENT = """
+    SELECT i.isin, i.figi, i.maturity_date, i.coupon, i.currency,
+           iss.legal_name, iss.lei, iss.country, iss.sector
+    FROM instruments i
+    JOIN issuers iss ON i.issuer_id = iss.issuer_id
+    WHERE i.isin = ?
+"""
+
+# Get the most recent rating based on rating_date
+_Q_RATING = """
+    SELECT agency, rating_value, rating_date
+    FROM bond_ratings
+    WHERE isin = ?
+    ORDER BY rating_date DESC
+    LIMIT 1
+"""
+
+# Full-text search over both legal_name and lei, best matches first
+_Q_SEARCH = """
+    SELECT iss.lei, iss.legal_name, iss.country, iss.sector
+    FROM issuers_fts f
+    JOIN issuers iss ON iss.issuer_id = f.rowid
+    WHERE issuers_fts MATCH ?
+    ORDER BY f.rank
+    LIMIT ?
+"""
+
+# Total number of matches, for searches that hit SEARCH_MAX_MATCHES
+_Q_SEARCH_COUNT = """
+    SELECT COUNT(*)
+    FROM issuers_fts
+    WHERE issuers_fts MATCH ?
+"""
+
+def to_json(data) -> str:
+    """Serialize a tool result as compact JSON."""
+    return json.dumps(data, separators=(",", ":"))
+
+def cap_rows(rows: list) -> tuple[list, bool]:
+    """
+    Return the leading rows whose compact JSON fits in SEARCH_MAX_PAYLOAD_BYTES,
+    and whether any rows were dropped.
+    """
+    if len(to_json(rows)) <= SEARCH_MAX_PAYLOAD_BYTES:
+        return rows, False
+
+    kept = []
+    size = 2  # Enclosing brackets
+    for row in rows:
+        size += len(to_json(row)) + 1  # Row plus separating comma
+        if size > SEARCH_MAX_PAYLOAD_BYTES:
+            break
+        kept.append(row)
+    return kept, True
+
 def get_db_connection():
     """
-    Establishes a connection to the SQLite database.
-    Uses generic read-only access where possible to avoid locking issues on Windows.
+    Returns this thread's read-only connection to the SQLite database, opening it on first use.
+    The server only reads, so the connection is never closed between tool calls.
     """
-    # Use URI format for read-only mode if supported, otherwise standard connect
-    # Windows paths can be tricky with URIs, so we'll use standard connection 
-    # but ensure we close it promptly in the context manager.
-    conn = sqlite3.connect(str(DB_FILE))
-    conn.row_factory = sqlite3.Row
-    return conn
+    if not hasattr(_tls, "conn"):
+        # Path.as_uri() produces a valid file: URI on Windows too (file:///C:/...)
+        conn = sqlite3.connect(f"{DB_FILE.as_uri()}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only=1")
+        conn.execute("PRAGMA mmap_size=268435456")
+        _tls.conn = conn
+    return _tls.conn
 
 @mcp.tool()
 def get_instrument_details(isin: str) -> str:
@@ -29,34 +108,22 @@ def get_instrument_details(isin: str) -> str:
     Args:
         isin: The International Securities Identification Number of the bond.
     """
-    conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        query = """
-            SELECT i.isin, i.figi, i.maturity_date, i.coupon, i.currency,
-                   iss.legal_name, iss.lei, iss.country, iss.sector
-            FROM instruments i
-            JOIN issuers iss ON i.issuer_id = iss.issuer_id
-            WHERE i.isin = ?
-        """
-        
-        cursor.execute(query, (isin,))
+        cursor.execute(_Q_INSTRUMENT, (isin,))
         row = cursor.fetchone()
         
         if row:
             # Convert Row object to dict for better serialization/formatting
             data = dict(row)
-            return str(data)
+            return to_json(data)
         else:
             return f"ISIN {isin} not found."
             
     except Exception as e:
         return f"Error retrieving instrument details: {str(e)}"
-    finally:
-        if conn:
-            conn.close()
 
 @mcp.tool()
 def get_bond_rating(isin: str) -> str:
@@ -66,21 +133,11 @@ def get_bond_rating(isin: str) -> str:
     Args:
         isin: The International Securities Identification Number of the bond.
     """
-    conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Get the most recent rating based on rating_date
-        query = """
-            SELECT agency, rating_value, rating_date
-            FROM bond_ratings
-            WHERE isin = ?
-            ORDER BY rating_date DESC
-            LIMIT 1
-        """
-        
-        cursor.execute(query, (isin,))
+        cursor.execute(_Q_RATING, (isin,))
         row = cursor.fetchone()
         
         if row:
@@ -90,9 +147,6 @@ def get_bond_rating(isin: str) -> str:
             
     except Exception as e:
         return f"Error retrieving bond rating: {str(e)}"
-    finally:
-        if conn:
-            conn.close()
 
 @mcp.tool()
 def search_issuer(name: str) -> str:
@@ -102,31 +156,73 @@ def search_issuer(name: str) -> str:
     Args:
         name: The name or partial name of the issuer to search for.
     """
-    conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Enhanced query to search both legal_name and lei
-        query = """
-            SELECT lei, legal_name, country, sector
-            FROM issuers
-            WHERE legal_name LIKE ? OR lei LIKE ?
-        """
-        
-        # Add wildcards for partial match
-        search_term = f"%{name}%"
-        cursor.execute(query, (search_term, search_term))
+        # Quote each word (so FTS5 syntax in user input is treated literally) and prefix-match it
+        tokens = re.findall(r"\w+", name)
+        if not tokens:
+            return f"No issuers found matching '{name}'."
+        search_term = " ".join(f'"{token}"*' for token in tokens)
+        cursor.execute(_Q_SEARCH, (search_term, SEARCH_MAX_MATCHES))
         rows = cursor.fetchall()
         
         if rows:
             results = [dict(row) for row in rows]
-            return str(results)
+            if len(results) <= SEARCH_INLINE_MAX_ROWS:
+                return to_json(results)
+
+            total = len(results)
+            if total == SEARCH_MAX_MATCHES:
+                cursor.execute(_Q_SEARCH_COUNT, (search_term,))
+                total = cursor.fetchone()[0]
+
+            result_id = uuid4().hex
+            _RESULT_CACHE[result_id] = {"total": total, "rows": results}
+            if len(_RESULT_CACHE) > _RESULT_CACHE_MAX_ENTRIES:
+                _RESULT_CACHE.popitem(last=False)
+
+            response = {
+                "count": total,
+                "preview": results[:SEARCH_PREVIEW_ROWS],
+                "result_id": result_id,
+            }
+            if total > len(results):
+                response["available"] = len(results)
+                response["hint"] = f"only the first {len(results)} matches can be paged; narrow your search"
+            return to_json(response)
         else:
             return f"No issuers found matching '{name}'."
             
     except Exception as e:
         return f"Error searching for issuer: {str(e)}"
-    finally:
-        if conn:
-            conn.close()
+
+@mcp.tool()
+def get_issuer_search_page(result_id: str, offset: int = 0, limit: int = 5) -> str:
+    """
+    Fetch more rows from a previous search_issuer call that returned a result_id.
+    
+    Args:
+        result_id: The result_id returned by search_issuer.
+        offset: Index of the first row to return.
+        limit: Maximum number of rows to return.
+    """
+    cached = _RESULT_CACHE.get(result_id)
+    if cached is None:
+        return f"Search result {result_id} not found or expired. Run search_issuer again."
+
+    results = cached["rows"]
+    offset = max(offset, 0)
+    limit = min(max(limit, 1), SEARCH_MAX_LIMIT)
+    rows, truncated = cap_rows(results[offset:offset + limit])
+    page = {
+        "count": cached["total"],
+        "offset": offset,
+        "rows": rows,
+        "has_more": offset + len(rows) < len(results),
+    }
+    if truncated:
+        page["truncated"] = True
+        page["hint"] = "page cut to fit the size limit; continue from offset + len(rows)"
+    return to_json(page)
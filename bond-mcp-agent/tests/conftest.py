@@ -0,0 +1,56 @@
+import sqlite3
+import threading
+
+import pytest
+import pytest_asyncio
+from fastmcp import Client
+
+import agent_app
+import database
+import server
+
+
+@pytest.fixture
+def finance_db(tmp_path, monkeypatch):
+    """A freshly initialized and seeded database, shared by database.py and server.py."""
+    db_file = tmp_path / "finance.db"
+    monkeypatch.setattr(database, "DB_FILE", db_file)
+    monkeypatch.setattr(server, "DB_FILE", db_file)
+    # Drop any connection cached against another test's database
+    monkeypatch.setattr(server, "_tls", threading.local())
+    database.init_db()
+    database.seed_data()
+    return db_file
+
+
+@pytest.fixture
+def add_issuers(finance_db):
+    """Insert count extra issuers named '<name> <i>' into the test database."""
+    def _add(count: int, name: str = "Municipal Authority"):
+        conn = sqlite3.connect(finance_db)
+        conn.executemany(
+            "INSERT INTO issuers (lei, legal_name, country, sector) VALUES (?, ?, ?, ?)",
+            [(f"MUNI{i:016d}", f"{name} {i}", "USA", "Government") for i in range(count)],
+        )
+        conn.commit()
+        conn.close()
+    return _add
+
+
+class InMemoryPool:
+    """Stands in for MCPServerPool, calling server.py in-process instead of over stdio."""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def call_tool(self, name, arguments):
+        return await self.session.call_tool(name, arguments=arguments)
+
+
+@pytest_asyncio.fixture
+async def mcp_tools(finance_db, tmp_path, monkeypatch):
+    """LangChain tools converted from the real server.py tool catalog, keyed by name."""
+    monkeypatch.setattr(agent_app, "_TOOL_CACHE_PATH", tmp_path / "tool_cache.json")
+    async with Client(server.mcp) as client:
+        tools = await agent_app.convert_mcp_tools(InMemoryPool(client.session))
+        yield {tool.name: tool for tool in tools}
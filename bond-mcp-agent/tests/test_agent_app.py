@@ -0,0 +1,288 @@
+import json
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import anyio
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.prebuilt import create_react_agent
+from mcp import McpError
+from mcp.types import ErrorData
+
+import agent_app
+
+
+class ToolCallingFakeModel(FakeMessagesListChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+class FlakySession:
+    """Fake ClientSession whose first call_tool() raises the given error."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    async def call_tool(self, name, arguments=None, read_timeout_seconds=None):
+        self.calls.append((name, arguments, read_timeout_seconds))
+        if self.error is not None:
+            raise self.error
+        return "ok"
+
+
+def pool_over(monkeypatch, *sessions):
+    """An MCPServerPool that hands out the given sessions in turn and counts close() calls."""
+    pool = agent_app.MCPServerPool()
+    remaining = list(sessions)
+    pool.closed = 0
+
+    async def ensure_ready():
+        return remaining[0]
+
+    async def close():
+        pool.closed += 1
+        remaining.pop(0)
+
+    monkeypatch.setattr(pool, "ensure_ready", ensure_ready)
+    monkeypatch.setattr(pool, "close", close)
+    return pool
+
+
+class FakeIntentLLM:
+    """Stands in for the YES/NO fallback model, recording the prompts it receives."""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.prompts = []
+
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt)
+        return AIMessage(content=self.answer)
+
+
+class CountingSession:
+    """Fake ClientSession that counts list_tools() calls."""
+
+    def __init__(self):
+        self.list_tools_calls = 0
+
+    async def list_tools(self):
+        self.list_tools_calls += 1
+        tool = SimpleNamespace(name="ping", description="Ping the server.", inputSchema={"type": "object"})
+        return SimpleNamespace(tools=[tool])
+
+
+@pytest.mark.parametrize(
+    "prop_def, expected",
+    [
+        ({"type": "string"}, str),
+        ({"type": "integer"}, int),
+        ({"type": "number"}, float),
+        ({"type": "boolean"}, bool),
+        ({"type": "object"}, Dict[str, Any]),
+        ({"type": "array", "items": {"type": "integer"}}, List[int]),
+        ({"type": "array"}, List[str]),
+        ({"type": "something-new"}, str),
+        ({"type": ["integer", "null"]}, int),
+        ({"type": ["null", "array"], "items": {"type": "number"}}, List[float]),
+        ({"type": ["null"]}, str),
+        ({}, str),
+    ],
+)
+def test_json_schema_type_maps_basic_types(prop_def, expected):
+    assert agent_app._json_schema_type(prop_def) == expected
+
+
+def test_json_schema_type_resolves_optional_any_of():
+    prop_def = {"anyOf": [{"type": "integer"}, {"type": "null"}]}
+    assert agent_app._json_schema_type(prop_def) is int
+
+
+def test_build_args_model_uses_mapped_types():
+    schema = '{"properties": {"isin": {"type": "string"}, "limit": {"type": "integer"}}, "required": ["isin"]}'
+    model = agent_app._build_args_model("example", schema)
+
+    assert model.model_fields["isin"].annotation is str
+    assert model.model_fields["limit"].annotation == Optional[int]
+    assert model(isin="US912810TS08", limit="5").limit == 5
+
+
+@pytest.mark.asyncio
+async def test_tool_call_without_optional_arguments(mcp_tools, add_issuers):
+    add_issuers(10)
+
+    search = json.loads(await mcp_tools["search_issuer"].ainvoke({"name": "Municipal"}))
+    page = json.loads(await mcp_tools["get_issuer_search_page"].ainvoke({"result_id": search["result_id"]}))
+
+    assert page["count"] == 10
+    assert page["offset"] == 0
+    assert len(page["rows"]) == 5
+
+
+@pytest.mark.asyncio
+async def test_tool_call_drops_explicit_nulls(mcp_tools):
+    search = json.loads(await mcp_tools["search_issuer"].ainvoke({"name": "Apple"}))
+    assert search[0]["legal_name"] == "Apple Inc."
+
+    response = await mcp_tools["get_issuer_search_page"].ainvoke({"result_id": "missing", "offset": None, "limit": None})
+    assert "not found or expired" in response
+
+
+def test_optional_fields_take_schema_defaults():
+    schema = '{"properties": {"result_id": {"type": "string"}, "limit": {"type": "integer", "default": 5}}, "required": ["result_id"]}'
+    model = agent_app._build_args_model("defaults", schema)
+    assert model(result_id="abc").limit == 5
+
+
+@pytest.mark.asyncio
+async def test_react_agent_runs_converted_tools(mcp_tools):
+    model = ToolCallingFakeModel(responses=[
+        AIMessage(content="", tool_calls=[{"name": "search_issuer", "args": {"name": "Treasury"}, "id": "call-1"}]),
+        AIMessage(content="US Treasury is the issuer."),
+    ])
+    agent = create_react_agent(model, list(mcp_tools.values()))
+
+    result = await agent.ainvoke({"messages": [("user", "Who issues treasuries?")]})
+
+    tool_messages = [m for m in result["messages"] if isinstance(m, ToolMessage)]
+    assert len(tool_messages) == 1
+    assert "US Treasury" in tool_messages[0].content
+
+
+def test_compact_tool_description_splits_summary_and_args():
+    summary, arg_docs = agent_app._compact_tool_description(
+        """
+        Fetch more rows from a previous search.
+
+        Args:
+            result_id: The result_id returned by search_issuer.
+            offset: Index of the first row
+                to return.
+        """
+    )
+
+    assert summary == "Fetch more rows from a previous search."
+    assert arg_docs == {
+        "result_id": "The result_id returned by search_issuer.",
+        "offset": "Index of the first row to return.",
+    }
+
+
+def test_compact_tool_description_without_args_section():
+    summary, arg_docs = agent_app._compact_tool_description("Look up a bond.\n\n    Returns JSON.")
+    assert summary == "Look up a bond. Returns JSON."
+    assert arg_docs == {}
+
+
+def test_compact_tool_description_caps_summary_length():
+    summary, _ = agent_app._compact_tool_description("word " * 100)
+    assert len(summary) == agent_app.TOOL_DESCRIPTION_MAX_CHARS
+
+
+def test_build_args_model_caps_field_descriptions():
+    description = " ".join(f"w{i}" for i in range(40))
+    schema = json.dumps({"properties": {"name": {"type": "string", "description": description}}, "required": ["name"]})
+    model = agent_app._build_args_model("capped", schema)
+    assert model.model_fields["name"].description.split() == description.split()[:agent_app.ARG_DESCRIPTION_MAX_WORDS]
+
+
+def test_converted_tool_uses_docstring_for_arg_descriptions(mcp_tools):
+    tool = mcp_tools["get_issuer_search_page"]
+    assert tool.description == "Fetch more rows from a previous search_issuer call that returned a result_id."
+    assert tool.args["offset"]["description"] == "Index of the first row to return."
+
+
+@pytest.mark.asyncio
+async def test_tool_catalog_is_cached_until_the_key_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(agent_app, "_TOOL_CACHE_PATH", tmp_path / "tool_cache.json")
+    session = CountingSession()
+
+    first = await agent_app.load_or_discover_tools(session)
+    second = await agent_app.load_or_discover_tools(session)
+    assert session.list_tools_calls == 1
+    assert first == second == [{"name": "ping", "description": "Ping the server.", "inputSchema": {"type": "object"}}]
+
+    monkeypatch.setattr(agent_app, "_tool_cache_key", lambda: "changed")
+    await agent_app.load_or_discover_tools(session)
+    assert session.list_tools_calls == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("contents", ["[]", "not json", '{"tools": []}'])
+async def test_unusable_tool_cache_falls_through_to_discovery(tmp_path, monkeypatch, contents):
+    cache_path = tmp_path / "tool_cache.json"
+    cache_path.write_text(contents)
+    monkeypatch.setattr(agent_app, "_TOOL_CACHE_PATH", cache_path)
+    session = CountingSession()
+
+    tools = await agent_app.load_or_discover_tools(session)
+
+    assert session.list_tools_calls == 1
+    assert tools[0]["name"] == "ping"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [
+    anyio.ClosedResourceError(),
+    McpError(ErrorData(code=408, message="Timed out while waiting for response")),
+])
+async def test_pool_reconnects_once_after_lost_connection(monkeypatch, error):
+    dead, fresh = FlakySession(error), FlakySession()
+    pool = pool_over(monkeypatch, dead, fresh)
+
+    assert await pool.call_tool("search_issuer", {"name": "Apple"}) == "ok"
+
+    assert pool.closed == 1
+    assert fresh.calls == [("search_issuer", {"name": "Apple"}, agent_app.TOOL_CALL_TIMEOUT)]
+
+
+@pytest.mark.asyncio
+async def test_pool_does_not_reconnect_on_tool_errors(monkeypatch):
+    session = FlakySession(McpError(ErrorData(code=-32602, message="Invalid params")))
+    pool = pool_over(monkeypatch, session)
+
+    with pytest.raises(McpError):
+        await pool.call_tool("search_issuer", {})
+
+    assert pool.closed == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("score, llm_answer, expected, llm_called", [
+    (0.4, "N", True, False),
+    (0.3, "Y", True, True),
+    (0.3, "N", False, True),
+    (0.2, "Y", False, False),
+])
+async def test_validate_intent_only_asks_the_llm_in_the_uncertain_band(monkeypatch, score, llm_answer, expected, llm_called):
+    llm = FakeIntentLLM(llm_answer)
+    monkeypatch.setattr(agent_app, "_intent_score", lambda message: score)
+    monkeypatch.setattr(agent_app, "get_intent_llm", lambda: llm)
+
+    assert await agent_app.validate_intent("What is Apple's rating?") is expected
+    assert bool(llm.prompts) is llm_called
+
+
+@pytest.mark.asyncio
+async def test_intent_model_failure_is_reported_in_the_chat(monkeypatch):
+    def fail_to_load(message):
+        raise OSError("model hub unreachable")
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(agent_app, "_intent_score", fail_to_load)
+    monkeypatch.setattr(agent_app.mcp_pool, "start_warm_up", lambda: None)
+
+    updates = [update async for update in agent_app.run_agent_interaction("Apple bonds", [])]
+
+    assert updates[-1] == "Error: model hub unreachable"
+
+
+def test_undocumented_args_carry_no_description():
+    schema = '{"properties": {"isin": {"type": "string"}, "limit": {"type": "integer", "default": 5}}, "required": ["isin"]}'
+    model = agent_app._build_args_model("undocumented", schema)
+
+    properties = model.model_json_schema()["properties"]
+    assert "description" not in properties["isin"]
+    assert "description" not in properties["limit"]
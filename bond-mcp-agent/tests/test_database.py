@@ -0,0 +1,54 @@
+import sqlite3
+
+import pytest
+
+import database
+
+
+def test_init_db_recreates_fts_index_built_with_another_tokenizer(tmp_path, monkeypatch):
+    db_file = tmp_path / "finance.db"
+    monkeypatch.setattr(database, "DB_FILE", db_file)
+    database.init_db()
+    database.seed_data()
+
+    conn = sqlite3.connect(db_file)
+    conn.execute("DROP TABLE issuers_fts")
+    conn.execute(
+        "CREATE VIRTUAL TABLE issuers_fts USING fts5(legal_name, lei, content='issuers', "
+        "content_rowid='issuer_id', tokenize='porter unicode61')"
+    )
+    conn.commit()
+    conn.close()
+
+    database.init_db()
+
+    conn = sqlite3.connect(db_file)
+    (sql,) = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'issuers_fts'").fetchone()
+    matches = conn.execute("SELECT rowid FROM issuers_fts WHERE issuers_fts MATCH '\"governm\"*'").fetchall()
+    conn.close()
+
+    assert "porter" not in sql
+    assert len(matches) == 1
+
+
+def test_failed_seed_rolls_back_and_keeps_wal(tmp_path, monkeypatch):
+    db_file = tmp_path / "finance.db"
+    monkeypatch.setattr(database, "DB_FILE", db_file)
+    database.init_db()
+
+    # An instrument left over without its issuer makes the seed's instruments insert collide
+    conn = sqlite3.connect(db_file)
+    conn.execute("INSERT INTO instruments (isin) VALUES ('US912810TS08')")
+    conn.commit()
+    conn.close()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        database.seed_data()
+
+    conn = sqlite3.connect(db_file)
+    (journal_mode,) = conn.execute("PRAGMA journal_mode").fetchone()
+    (issuer_count,) = conn.execute("SELECT COUNT(*) FROM issuers").fetchone()
+    conn.close()
+
+    assert journal_mode == "wal"
+    assert issuer_count == 0
@@ -0,0 +1,125 @@
+import json
+
+import pytest
+from fastmcp import Client
+
+import server
+
+
+def search(name: str):
+    return server.search_issuer.fn(name)
+
+
+def legal_names(response: str):
+    return [row["legal_name"] for row in json.loads(response)]
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("Governm", "Japan Government"),
+        ("Investm", "European Investment Bank"),
+        ("treas", "US Treasury"),
+        ("Apple", "Apple Inc."),
+        ("bank invest", "European Investment Bank"),
+    ],
+)
+def test_search_issuer_matches_partial_names(finance_db, name, expected):
+    assert legal_names(search(name)) == [expected]
+
+
+def test_search_issuer_matches_lei_prefix(finance_db):
+    assert legal_names(search("549300F")) == ["Apple Inc."]
+    assert legal_names(search("5493006MNBPLPEVJEJ08")) == ["US Treasury"]
+
+
+def test_search_issuer_treats_fts_syntax_literally(finance_db):
+    assert search('"x OR') == "No issuers found matching '\"x OR'."
+    assert search("%%") == "No issuers found matching '%%'."
+
+
+def test_search_issuer_pages_large_results_by_result_id(add_issuers):
+    add_issuers(300)
+
+    response = json.loads(search("Municipal"))
+    assert response["count"] == 300
+    assert len(response["preview"]) == server.SEARCH_PREVIEW_ROWS
+    assert "available" not in response
+
+    page = json.loads(server.get_issuer_search_page.fn(response["result_id"], offset=250, limit=10))
+    assert page["count"] == 300
+    assert len(page["rows"]) == 10
+    assert page["has_more"] is True
+
+    last = json.loads(server.get_issuer_search_page.fn(response["result_id"], offset=295, limit=10))
+    assert len(last["rows"]) == 5
+    assert last["has_more"] is False
+
+
+def test_search_issuer_reports_true_total_beyond_match_cap(add_issuers, monkeypatch):
+    monkeypatch.setattr(server, "SEARCH_MAX_MATCHES", 50)
+    add_issuers(120)
+
+    response = json.loads(search("Municipal"))
+    assert response["count"] == 120
+    assert response["available"] == 50
+
+
+def test_get_issuer_search_page_caps_payload_size(add_issuers):
+    add_issuers(150)
+    result_id = json.loads(search("Municipal"))["result_id"]
+
+    page = json.loads(server.get_issuer_search_page.fn(result_id, offset=0, limit=100))
+    assert len(server.to_json(page["rows"])) <= server.SEARCH_MAX_PAYLOAD_BYTES
+    assert 0 < len(page["rows"]) < 100
+    assert page["truncated"] is True
+    assert page["has_more"] is True
+
+
+def test_cap_rows_keeps_leading_rows_within_limit():
+    rows = [{"value": "x" * 1000} for _ in range(20)]
+
+    kept, truncated = server.cap_rows(rows)
+
+    assert truncated is True
+    assert kept == rows[:len(kept)]
+    assert len(server.to_json(kept)) <= server.SEARCH_MAX_PAYLOAD_BYTES
+    assert len(server.to_json(rows[:len(kept) + 1])) > server.SEARCH_MAX_PAYLOAD_BYTES
+
+
+def test_cap_rows_leaves_small_pages_untouched():
+    rows = [{"value": "x"} for _ in range(5)]
+    assert server.cap_rows(rows) == (rows, False)
+
+
+def test_get_instrument_details_returns_compact_json(finance_db):
+    response = server.get_instrument_details.fn("US037833AS99")
+
+    assert " " not in response.replace("Apple Inc.", "")
+    assert json.loads(response)["legal_name"] == "Apple Inc."
+
+
+def test_search_issuer_returns_small_results_inline(finance_db):
+    assert json.loads(search("Government")) == [
+        {"lei": "JPSK01239102", "legal_name": "Japan Government", "country": "JP", "sector": "Government"}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_issuer_search_page_with_only_result_id(add_issuers):
+    add_issuers(12)
+    result_id = json.loads(search("Municipal"))["result_id"]
+
+    async with Client(server.mcp) as client:
+        result = await client.call_tool("get_issuer_search_page", {"result_id": result_id})
+
+    page = json.loads(result.content[0].text)
+    assert page["count"] == 12
+    assert page["offset"] == 0
+    assert len(page["rows"]) == 5
+    assert page["has_more"] is True
+
+
+def test_get_issuer_search_page_unknown_result_id(finance_db):
+    response = server.get_issuer_search_page.fn("does-not-exist")
+    assert response == "Search result does-not-exist not found or expired. Run search_issuer again."